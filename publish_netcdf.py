@@ -1,24 +1,35 @@
 import os
+import re
 import dotenv
 import logging
 import time
 import textwrap
 import argparse
 import stat
-import glob
 import pathlib
 import datetime
 import shutil
+import sqlite3
 import subprocess
+import concurrent.futures
+import threading
 from irods.session import iRODSSession
 from irods.meta import iRODSMeta
+from irods.models import Collection, DataObject
+from irods.column import Like
+from irods.exception import iRODSException, PycommandsException
+import irods.keywords as kw
 
-RESOURCE_ID_GLOB = "????????????????????????????????"
+RESOURCE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
 EXCLUDED = ["bags", "temp", "zips"]
 IS_PUBLIC_KEY = "isPublic"
 IS_PUBLIC_VALUE = "true"
 NETCDF_EXTENSIONS = [".nc", ".nc4"]
 FILE_MODE = stat.S_IRWXU | stat.S_IRGRP | stat.S_IXGRP | stat.S_IROTH | stat.S_IXOTH
+DEFAULT_WORKERS = 6
+DEFAULT_IGET_THREADS = 4
+CACHE_TTL = 24 * 60 * 60
+MAX_RESOURCE_QUERIES = 100
 
 logger = logging.getLogger(__name__)
 
@@ -40,17 +51,50 @@ def rchmod(path, mode):
     Where:
         path: <str> Absolute path to change filesystems permissions
         mode: <int> numeric mode for all changes consistent with constants in the stats library
+
+    Raises:
+        NetCDFPublicationError
     """
 
-    os.chmod(path, mode)
-    for root, dirs, files in os.walk(path):
-        for d in dirs:
-            os.chmod(os.path.join(root, d), mode)
-        for f in files:
-            os.chmod(os.path.join(root, f), mode)
+    # A single chmod process traverses the tree far faster than a chmod call per child from Python
+    proc = subprocess.run(["chmod", "-R", f"{mode:o}", path],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=False)
+    if proc.returncode:
+        logger.error(f"Changing permissions of {path} failed: {proc.stderr.decode().strip()}")
+        raise NetCDFPublicationError(f"chmod {path} failed")
     return None
 
 
+def walk_bottom_up(path):
+    """
+    Walk the children underneath a path, yielding the deepest directories first.
+
+    walk_bottom_up(path) -> <generator> of (root, dirs, files)
+
+    Where:
+        path: <str> Absolute path to traverse
+
+    Yields: three-<tuple>s in the manner of os.walk(path, topdown=False) where:
+        a) first element is a <str> directory path,
+        b) second element is a <list> of <str> names of its subdirectories, and
+        c) third element is a <list> of <str> names of its files.
+
+    Only one directory listing is held at a time rather than the whole tree.
+    """
+
+    dirs = []
+    files = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                dirs.append(entry.name)
+                if not entry.is_symlink():
+                    yield from walk_bottom_up(entry.path)
+            else:
+                files.append(entry.name)
+    yield path, dirs, files
+
+
 def replace_spaces_in_names(path):
     """
     Recursively replace spaces in names of all of the children underneath a path.'
@@ -65,12 +109,23 @@ def replace_spaces_in_names(path):
 
     Spaces are replaced with dunders as cases have been encountered where replacing
     with a single underscore resulted in a name collision.
+
+    Raises:
+        NetCDFPublicationError
     """
 
+    # Nearly all resources have no names with spaces, so let a single find process look for the first one
+    # before walking the tree from Python
+    proc = subprocess.run(["find", path, "-mindepth", "1", "-name", "* *", "-print", "-quit"],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=False)
+    if proc.returncode:
+        logger.error(f"Finding names with spaces in {path} failed: {proc.stderr.decode().strip()}")
+        raise NetCDFPublicationError(f"find {path} failed")
+    if not proc.stdout:
+        return None
+
     replaced = 0
-    walk = list(os.walk(path))
-    walk.reverse()
-    for root, dirs, files in walk:
+    for root, dirs, files in walk_bottom_up(path):
         for f in files:
             if " " in f:
                 replacement = os.path.join(root, f.replace(" ", "__"))
@@ -92,45 +147,77 @@ def replace_spaces_in_names(path):
     return None
 
 
-def get_latest_resource_timestamp(irods_env, collection_path):
+def latest_resource_timestamp(session, collection_path):
     """
-    Return the latest modifcation time among the collection's data objects.
+    Return the latest modifcation time among the collection's data objects using an open session.
 
-    get_latest_resource_timestamp(collection_path) -> <datetime.datetime>
+    latest_resource_timestamp(session, collection_path) -> <datetime.datetime>
 
     Where:
-        irods_env:    <str> Absolute path to the iRODS environment file
+        session:         <irods.session.iRODSSession> An open iRODS session
         collection_path: <str> Absolute iRODS path to the collection
 
     Returns: <datetime.datetime> The latest modification time
 
+    Raises:
+        NetCDFPublicationError
+
     This function should become deprecated with iRODS 4.2.9 which updates collection modification times
     whenever a contained data object is modified.
     """
 
-    with iRODSSession(irods_env_file=irods_env) as session:
-        collection = session.collections.get(collection_path)
-        tree = [leaf for leaf in collection.walk()]
-        data_objects = []
-        for leaf in tree:
-            data_objects.extend(leaf[2])
-        timestamps = [data_object.modify_time for data_object in data_objects]
-
-    timestamp = max(timestamps)
+    collection = session.collections.get(collection_path)
+    # Reduce over the walk as it is generated rather than collecting the whole tree first
+    timestamp = max((data_object.modify_time for _, _, data_objects in collection.walk() for data_object in data_objects),
+                    default=None)
+    if timestamp is None:
+        logger.error(f"Collection {collection_path} has no data objects")
+        raise NetCDFPublicationError(f"{collection_path} has no data objects")
     return timestamp
 
 
-def publish_resource(irods_env, proxy_path, catalog_path, resource_id):
+def get_collection(session, collection_path, local_path, threads=DEFAULT_IGET_THREADS):
+    """
+    Recursively download a collection, overwriting existing local files.
+
+    get_collection(session, collection_path, local_path, threads) -> None
+
+    Where:
+        session:         <irods.session.iRODSSession> An open iRODS session
+        collection_path: <str> Absolute iRODS path to the collection
+        local_path:      <str> Absolute local path to download the collection to
+        threads:         <int> Number of threads for the parallel transfer of each data object
+
+    This is the in-process equivalent of `iget -rf collection_path local_path`.
+    """
+
+    collection = session.collections.get(collection_path)
+    options = {kw.FORCE_FLAG_KW: "", kw.NUM_THREADS_KW: threads}
+    for subcollection, _, data_objects in collection.walk():
+        local_directory = os.path.normpath(os.path.join(local_path, os.path.relpath(subcollection.path, collection_path)))
+        os.makedirs(local_directory, exist_ok=True)
+        for data_object in data_objects:
+            session.data_objects.get(data_object.path,
+                                     os.path.join(local_directory, data_object.name),
+                                     num_threads=threads,
+                                     **options)
+    return None
+
+
+def publish_resource(irods_env, proxy_path, catalog_path, resource_id, timestamp=None, threads=DEFAULT_IGET_THREADS):
     """
     Copy the resource with its timestamp.
 
-    publish_resource(proxy_path, catalog_path, resource_id) -> None
+    publish_resource(proxy_path, catalog_path, resource_id, timestamp, threads) -> None
 
     Where:
         irods_env:    <str> Absolute path to the iRODS environment file
         proxy_path:   <str> Absolute iRODS proxy path to Hydroshare resources
         catalog_path: <str> Absolute THREDDS catalog path to publish resources
         resource_id:  <str> Resource ID to publish
+        timestamp:    <datetime.datetime> Optional latest modification time of the resource, as found by scan_source.
+                      If not specified, the resource's collection is walked to find it.
+        threads:      <int> Number of threads for the parallel transfer of each data object
 
     Raises:
         NetCDFPublicationError
@@ -140,39 +227,116 @@ def publish_resource(irods_env, proxy_path, catalog_path, resource_id):
     source = os.path.join(proxy_path, resource_id)
     destination = os.path.join(catalog_path, resource_id)
 
-    timestamp = get_latest_resource_timestamp(irods_env, source)
-
-    # The iget destination is the catalog path in light of https://github.com/irods/irods/issues/5527
-    proc = subprocess.Popen(["env", f"IRODS_ENVIRONMENT_FILE={irods_env}", "iget", "-rf", source, catalog_path],
-                            stdout=subprocess.PIPE,
-                            stderr=subprocess.PIPE)
-    stdout, stderr = proc.communicate()
-    if proc.returncode:
-        logger.error(f"Publishing resource ID: {resource_id} from {proxy_path} to {catalog_path} failed:" \
-                     f"return code: {proc.returncode} ::: " \
-                     f'stdout: {stdout} ::: ' \
-                     f"stderr: {stderr}")
-        raise NetCDFPublicationError(f"iget {source} to {destination} failed",
-                                     proc.returncode,
-                                     stdout,
-                                     stderr)
+    with iRODSSession(irods_env_file=irods_env) as session:
+        if timestamp is None:
+            timestamp = latest_resource_timestamp(session, source)
+        try:
+            get_collection(session, source, destination, threads)
+        # python-irodsclient raises a plain RuntimeError when a multi-threaded transfer fails
+        except (iRODSException, PycommandsException, OSError, RuntimeError) as e:
+            logger.error(f"Publishing resource ID: {resource_id} from {proxy_path} to {catalog_path} failed: {e!r}")
+            raise NetCDFPublicationError(f"get {source} to {destination} failed") from e
     rchmod(destination, FILE_MODE)
     # Fix for TDS 5. Hope to see a fix for this in TDS 5 itself.
     replace_spaces_in_names(destination)
-    os.utime(destination, (timestamp.timestamp(), timestamp.timestamp()))
+    # Whole seconds and microseconds are combined as integers so no float rounding reaches the nanoseconds
+    timestamp_ns = int(timestamp.replace(microsecond=0).timestamp()) * 10**9 + timestamp.microsecond * 1000
+    os.utime(destination, ns=(timestamp_ns, timestamp_ns))
     logger.info(f"Published resource ID: {resource_id} from {proxy_path} to {catalog_path} with timestamp: {timestamp}")
     return None
 
 
-def scan_source(irods_env, proxy_path):
+def open_cache(cache_path):
+    """
+    Open the cache of source resource scans, creating it if needed.
+
+    open_cache(cache_path) -> <sqlite3.Connection>
+
+    Where:
+        cache_path: <str> Absolute path to the SQLite cache file
+
+    Returns: <sqlite3.Connection> An open connection to the cache
+    """
+
+    cache = sqlite3.connect(cache_path)
+    cache.execute("CREATE TABLE IF NOT EXISTS resources ("
+                  "resource_id TEXT PRIMARY KEY, "
+                  "collection_mtime REAL, "
+                  "source_mtime REAL, "
+                  "netcdf_count INTEGER, "
+                  "last_checked REAL)")
+    return cache
+
+
+def query_resources(session, proxy_path, resource_ids, prefix="", count_netcdf=False):
+    """
+    Query the data objects of resources for their latest timestamps and their numbers of NetCDF data objects.
+
+    query_resources(session, proxy_path, resource_ids, prefix, count_netcdf) -> {resource_id: (timestamp, netcdf_count), ...}
+
+    Where:
+        session:      <irods.session.iRODSSession> An open iRODS session
+        proxy_path:   <str> Absolute iRODS proxy path to Hydroshare resources
+        resource_ids: <set> of <str> resource ids to include
+        prefix:       <str> Optional prefix of the resource collection names to query, such as a single resource id
+        count_netcdf: <bool> Whether to count every NetCDF data object rather than stopping at the first
+
+    Returns: <dict> of <str> resource ids with data objects to two-<tuple>s where:
+        a) first element is a <datetime.datetime> modification time, and
+        b) second element is an <int> number of NetCDF data objects, at most 1 unless counted.
+    """
+
+    query = session.query(Collection.name, DataObject.name, DataObject.modify_time) \
+                   .filter(Like(Collection.name, f"{proxy_path}/{prefix}%"))
+    netcdf_counts = {}
+    timestamps = {}
+    for row in query:
+        resource_id = row[Collection.name][len(proxy_path) + 1:].split("/", 1)[0]
+        if resource_id not in resource_ids:
+            continue
+        modify_time = row[DataObject.modify_time]
+        if resource_id not in timestamps or modify_time > timestamps[resource_id]:
+            timestamps[resource_id] = modify_time
+        if (count_netcdf or not netcdf_counts.get(resource_id)) \
+                and os.path.splitext(row[DataObject.name])[1].lower() in NETCDF_EXTENSIONS:
+            netcdf_counts[resource_id] = netcdf_counts.get(resource_id, 0) + 1
+    return {resource_id: (timestamp, netcdf_counts.get(resource_id, 0)) for resource_id, timestamp in timestamps.items()}
+
+
+def is_public(session, collection_path):
+    """
+    Return whether the collection is marked public in its metadata.
+
+    is_public(session, collection_path) -> <bool>
+
+    Where:
+        session:         <irods.session.iRODSSession> An open iRODS session
+        collection_path: <str> Absolute iRODS path to the collection
+
+    Returns: <bool> True if the collection's isPublic metadata is true
+    """
+
+    metadata = session.metadata.get(Collection, collection_path)
+    return any(meta.name == IS_PUBLIC_KEY and meta.value.lower() == IS_PUBLIC_VALUE for meta in metadata)
+
+
+def scan_source(irods_env, proxy_path, workers=DEFAULT_WORKERS, cache_path=None):
     """
     Scan the iRODS proxy path for all public Hydroshare resources containing NetCDF and their timestamps.
 
-    scan_source(irods_env, proxy_path) -> [(resource_id, timestamp), ...]
+    scan_source(irods_env, proxy_path, workers, cache_path) -> [(resource_id, timestamp), ...]
 
     Where:
         irods_env:    <str> Absolute path to the iRODS environment file
         proxy_path:   <str> Absolute iRODS proxy path to Hydroshare resources
+        workers:      <int> Number of subcollections to check for public metadata concurrently
+        cache_path:   <str> Optional absolute path to a SQLite cache of earlier scans.
+                      If specified, only resources whose collection modification time advanced since they were
+                      cached, or cached more than CACHE_TTL seconds ago, have their data objects queried.
+
+    Hydroshare keeps a resource's files under <resource_id>/data/contents, and changes there do not update the
+    resource collection's modification time. With a cache, changed resources and newly added NetCDF may therefore
+    go unnoticed for up to CACHE_TTL seconds. Without one, every public resource is queried on every scan.
 
     Returns: <list> of two-<tuple>s where:
         a) first element is a <str> resource id, and
@@ -184,26 +348,93 @@ def scan_source(irods_env, proxy_path):
         subcollections = [subcollection for subcollection in subcollections if subcollection.name not in EXCLUDED]
         logger.info(f"Number of included subcollections: {len(subcollections)}")
 
-        public = [subcollection for subcollection in subcollections
-                  if "isPublic" in subcollection.metadata.keys()
-                  and subcollection.metadata[IS_PUBLIC_KEY].value.lower() == IS_PUBLIC_VALUE]
+        # The metadata queries are independent and network-bound, so run several at once,
+        # each worker thread with its own session rather than sharing this one
+        worker = threading.local()
+        worker_sessions = []
+
+        def open_worker_session():
+            worker.session = iRODSSession(irods_env_file=irods_env)
+            worker_sessions.append(worker.session)
+
+        def check_public(subcollection):
+            return subcollection, is_public(worker.session, subcollection.path)
+
+        public = []
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers, initializer=open_worker_session) as executor:
+                futures = [executor.submit(check_public, subcollection) for subcollection in subcollections]
+                for future in concurrent.futures.as_completed(futures):
+                    subcollection, public_subcollection = future.result()
+                    if public_subcollection:
+                        public.append(subcollection)
+        finally:
+            for worker_session in worker_sessions:
+                worker_session.cleanup()
         logger.info(f"Number of public included subcollections: {len(public)}")
 
-        public_netcdf = []
-        for subcollection in public:
-            public_objects = [objs for col, subcol, objs in list(subcollection.walk())]
-            # flatten the list of lists of data objects
-            data_objects = []
-            for objs in public_objects:
-                data_objects.extend(objs)
-            netcdf_objects = [obj for obj in data_objects if pathlib.Path(obj.name).suffix.lower() in NETCDF_EXTENSIONS]
-            if netcdf_objects:
-                public_netcdf.append(subcollection.name)
-                logger.info(f"Subcollection name: {subcollection.name}; Number of NetCDF data objects in subcollection: {len(netcdf_objects)}")
-        logger.info(f"Number of public subcollections containing NetCDF: {len(public_netcdf)}")
-
-    source_netcdf = [(resource_id, get_latest_resource_timestamp(irods_env, os.path.join(proxy_path, resource_id)))
-                     for resource_id in public_netcdf]
+        public_ids = set(subcollection.name for subcollection in public)
+        # Counting every NetCDF data object is only needed for the debug log; otherwise the first one settles a resource
+        count_netcdf = logger.isEnabledFor(logging.DEBUG)
+        cache = open_cache(cache_path) if cache_path else None
+        try:
+            cached = {}
+            # Cached counts may have stopped at the first NetCDF data object, so counting needs every resource queried
+            if cache is not None and not count_netcdf:
+                cached = {row[0]: row[1:] for row in
+                          cache.execute("SELECT resource_id, collection_mtime, source_mtime, netcdf_count, last_checked "
+                                        "FROM resources")}
+            now = time.time()
+            resources = {}
+            collection_mtimes = {}
+            stale = set()
+            for subcollection in public:
+                collection_mtime = subcollection.modify_time.timestamp()
+                collection_mtimes[subcollection.name] = collection_mtime
+                entry = cached.get(subcollection.name)
+                # A resource collection's own modification time may miss changes deeper in the resource,
+                # so entries are also rechecked once they are older than the TTL
+                if entry is not None and entry[0] >= collection_mtime and now - entry[3] < CACHE_TTL:
+                    if entry[2]:
+                        resources[subcollection.name] = (datetime.datetime.fromtimestamp(entry[1]), entry[2])
+                else:
+                    stale.add(subcollection.name)
+            logger.info(f"Number of public included subcollections to query: {len(stale)}")
+
+            # A single recursive query over the proxy path instead of walking each public subcollection,
+            # unless the cache leaves only a few resources to query
+            if cache is None or len(stale) > MAX_RESOURCE_QUERIES:
+                queried = query_resources(session, proxy_path, stale, count_netcdf=count_netcdf)
+            else:
+                queried = {}
+                for resource_id in stale:
+                    queried.update(query_resources(session, proxy_path, {resource_id}, resource_id, count_netcdf))
+            resources.update((resource_id, (timestamp, netcdf_count))
+                             for resource_id, (timestamp, netcdf_count) in queried.items() if netcdf_count)
+
+            if cache is not None:
+                with cache:
+                    cache.executemany("INSERT OR REPLACE INTO resources "
+                                      "(resource_id, collection_mtime, source_mtime, netcdf_count, last_checked) "
+                                      "VALUES (?, ?, ?, ?, ?)",
+                                      [(resource_id,
+                                        collection_mtimes[resource_id],
+                                        queried[resource_id][0].timestamp() if resource_id in queried else None,
+                                        queried[resource_id][1] if resource_id in queried else 0,
+                                        now)
+                                       for resource_id in stale])
+                    cache.executemany("DELETE FROM resources WHERE resource_id = ?",
+                                      [(resource_id,) for resource_id in cached if resource_id not in public_ids])
+        finally:
+            if cache is not None:
+                cache.close()
+
+    source_netcdf = []
+    for resource_id, (timestamp, netcdf_count) in resources.items():
+        source_netcdf.append((resource_id, timestamp))
+        if count_netcdf:
+            logger.debug(f"Subcollection name: {resource_id}; Number of NetCDF data objects in subcollection: {netcdf_count}")
+    logger.info(f"Number of public subcollections containing NetCDF: {len(source_netcdf)}")
     return source_netcdf
 
 
@@ -221,10 +452,11 @@ def scan_destination(catalog_path):
         b) second element is a <datetime.datetime> modification time.
     """
 
-    resources = glob.glob(os.path.join(catalog_path, RESOURCE_ID_GLOB))
-    logger.info(f"Number of destination resources: {len(resources)}")
-    destination_netcdf = [(pathlib.PurePath(resource).name, datetime.datetime.fromtimestamp(os.path.getmtime(resource)))
-                          for resource in resources]    
+    with os.scandir(catalog_path) as entries:
+        destination_netcdf = [(entry.name, datetime.datetime.fromtimestamp(entry.stat().st_mtime))
+                              for entry in entries
+                              if RESOURCE_ID_PATTERN.match(entry.name) and entry.is_dir(follow_symlinks=False)]
+    logger.info(f"Number of destination resources: {len(destination_netcdf)}")
     return destination_netcdf
 
 
@@ -244,16 +476,21 @@ def remove_resource(catalog_path, resource_id):
     return None
 
 
-def sync_resources(irods_env, proxy_path, catalog_path):
+def sync_resources(irods_env, proxy_path, catalog_path, workers=DEFAULT_WORKERS, threads=DEFAULT_IGET_THREADS,
+                   cache_path=None):
     """
     Sync public netcdf resources between iRODS proxy and THREDDS catalog.
 
-    sync_resource(irods_env, proxy_path, catalog_path) -> None
+    sync_resource(irods_env, proxy_path, catalog_path, workers, threads, cache_path) -> None
 
     Where:
         irods_env:    <str> Absolute path to the iRODS environment file
         proxy_path:   <str> Absolute iRODS proxy path to Hydroshare resources
         catalog_path: <str> Absolute THREDDS catalog path to publish resources
+        workers:      <int> Number of resources to publish concurrently
+        threads:      <int> Number of threads for the parallel transfer of each data object
+        cache_path:   <str> Optional absolute path to a SQLite cache of earlier source scans.
+                      Changes to cached resources may be published up to CACHE_TTL seconds late, see scan_source.
 
     a) Scan all resources in the source path and publish the public resources containing NetCDF which:
         i) do not exist in the destination path, or
@@ -265,26 +502,32 @@ def sync_resources(irods_env, proxy_path, catalog_path):
 
     logger.info(f"Syncing resources from {proxy_path} to {catalog_path}")
     start_time = time.perf_counter()
-    source_netcdf = scan_source(irods_env, proxy_path)
-    destination_netcdf = scan_destination(catalog_path)
-    destination_ids = [destination[0] for destination in destination_netcdf]
-    destination_timestamps = [destination[1] for destination in destination_netcdf]
+    source_netcdf = scan_source(irods_env, proxy_path, workers, cache_path)
+    destination_timestamps = dict(scan_destination(catalog_path))
+    to_publish = []
     for source_id, source_timestamp in source_netcdf:
-        try:
-            if source_id not in destination_ids:
-                logger.info(f"Resource ID: {source_id} not in destination")
-                publish_resource(irods_env, proxy_path, catalog_path, source_id)
-            else:
-                index = destination_ids.index(source_id)
-                destination_timestamp = destination_timestamps[index]
-                if source_timestamp > destination_timestamp:
-                    logger.info(f"Resource ID: {source_id} source timestamp: {source_timestamp} > destination timestamp: {destination_timestamp}")
-                    publish_resource(irods_env, proxy_path, catalog_path, source_id)
-        except NetCDFPublicationError as e:
-            logger.warning(f"Syncing resources from {proxy_path} to {catalog_path} incomplete")
-    destination_netcdf = scan_destination(catalog_path)
-    source_ids = [source[0] for source in source_netcdf]
-    for destination_id, destination_timestamp in destination_netcdf:
+        if source_id not in destination_timestamps:
+            logger.info(f"Resource ID: {source_id} not in destination")
+            to_publish.append((source_id, source_timestamp))
+        else:
+            destination_timestamp = destination_timestamps[source_id]
+            # iRODS keeps whole-second modification times, so sub-second differences are not changes
+            if int(source_timestamp.timestamp()) > int(destination_timestamp.timestamp()):
+                logger.info(f"Resource ID: {source_id} source timestamp: {source_timestamp} > destination timestamp: {destination_timestamp}")
+                to_publish.append((source_id, source_timestamp))
+    # Each publication is an independent, network-bound transfer, so publish several at once
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(publish_resource, irods_env, proxy_path, catalog_path, resource_id, timestamp, threads): resource_id
+                   for resource_id, timestamp in to_publish}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except NetCDFPublicationError as e:
+                logger.warning(f"Syncing resources from {proxy_path} to {catalog_path} incomplete: resource ID: {futures[future]}")
+    # Resources published above are all in the source, so the destination scan from before publishing
+    # already holds every candidate for removal and the catalog need not be scanned again
+    source_ids = set(source_id for source_id, _ in source_netcdf)
+    for destination_id in destination_timestamps:
         if destination_id not in source_ids:
             logger.info(f"Resource ID: {destination_id} no longer in source")
             remove_resource(catalog_path, destination_id)
@@ -322,6 +565,9 @@ if __name__ == "__main__":
     irods_env = os.environ["PUBLIC_NETCDF_IRODS_ENVIRONMENT_FILE"]
     proxy_path = os.environ["PUBLIC_NETCDF_IRODS_PROXY_PATH"]
     catalog_path = os.environ['PUBLIC_NETCDF_THREDDS_CATALOG_PATH']
+    workers = int(os.environ.get("PUBLIC_NETCDF_WORKERS", DEFAULT_WORKERS))
+    threads = int(os.environ.get("PUBLIC_NETCDF_IGET_THREADS", DEFAULT_IGET_THREADS))
+    cache_path = os.environ.get("PUBLIC_NETCDF_CACHE")
 
     logging.basicConfig(filename=log_file,
                         # Available in Python 3.9+
@@ -336,10 +582,14 @@ if __name__ == "__main__":
             publish_resource(irods_env,
                              proxy_path,
                              catalog_path,
-                             args.resource_id)
+                             args.resource_id,
+                             threads=threads)
         except NetCDFPublicationError as e:
             logger.warning(f"Publishing resource {args.resource_id} from {args.src_path} to {args.dest_path} incomplete")
     else:
         sync_resources(irods_env,
                        proxy_path,
-                       catalog_path)
+                       catalog_path,
+                       workers,
+                       threads,
+                       cache_path)